@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 """Enhanced extraction of entities and events from papers"""
 
-import json
-import requests
+import orjson
 import re
+import sys
+import ahocorasick
 from collections import defaultdict, Counter
+from itertools import islice
+from multiprocessing import Pool
+from operator import itemgetter
 from datetime import datetime
-
-QDRANT_URL = "http://localhost:6333"
-COLLECTION_NAME = "papers"
+from paper_store import load_papers, extract_year_from_url
 
 # Known important models and systems
 KNOWN_MODELS = {
@@ -35,78 +37,92 @@ KNOWN_INSTITUTIONS = {
     "Tencent AI Lab", "ByteDance", "JD AI", "Samsung Research"
 }
 
-def extract_all_papers():
-    """Extract all papers from Qdrant"""
-    papers = []
-    offset = None
-    
-    while True:
-        payload = {"limit": 100, "with_payload": True, "with_vector": False}
-        if offset:
-            payload["offset"] = offset
-            
-        response = requests.post(
-            f"{QDRANT_URL}/collections/{COLLECTION_NAME}/points/scroll",
-            json=payload
-        )
-        
-        result = response.json()
-        batch = result.get("result", {}).get("points", [])
-        
-        if not batch:
-            break
-            
-        papers.extend(batch)
-        offset = result.get("result", {}).get("next_page_offset")
-        
-        if not offset:
-            break
-    
-    return papers
+def build_automaton(terms):
+    """Build an Aho-Corasick automaton over lowercased terms"""
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        key = term.lower()
+        automaton.add_word(key, (len(key), term))
+    automaton.make_automaton()
+    return automaton
+
+# Scanned once per paper instead of one search per known term
+MODEL_AC = build_automaton(KNOWN_MODELS)
+INSTITUTION_AC = build_automaton(KNOWN_INSTITUTIONS)
+
+# High-level topics and the lowercase keywords that indicate them
+TOPIC_KEYWORDS = {
+    "language-models": ["language model", "llm", "gpt", "bert", "transformer", "nlp", "text generation"],
+    "computer-vision": ["vision", "image", "visual", "detection", "segmentation", "cv", "cnn"],
+    "reinforcement-learning": ["reinforcement learning", "rl", "agent", "reward", "policy", "q-learning"],
+    "generative-ai": ["generative", "diffusion", "gan", "vae", "synthesis", "generation"],
+    "multimodal": ["multimodal", "cross-modal", "vision-language", "clip", "dalle"],
+    "optimization": ["optimization", "efficient", "compression", "quantization", "pruning"],
+    "robotics": ["robot", "robotic", "manipulation", "navigation", "embodied"],
+    "security": ["security", "privacy", "adversarial", "attack", "defense", "safety"],
+    "theory": ["theory", "theoretical", "proof", "bound", "convergence", "complexity"],
+    "applications": ["application", "medical", "finance", "science", "engineering", "biology"]
+}
+
+def build_topic_automaton(topic_keywords):
+    """Build an Aho-Corasick automaton mapping each keyword to its topic"""
+    automaton = ahocorasick.Automaton()
+    for topic, keywords in topic_keywords.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, topic)
+    automaton.make_automaton()
+    return automaton
+
+TOPIC_AC = build_topic_automaton(TOPIC_KEYWORDS)
+
+# Model names with version numbers, or acronyms in parentheses. The acronym
+# branch is a lookahead so version names inside the parentheses still match.
+MODEL_PATTERN = re.compile(
+    r'\b(?P<version>[A-Z][a-zA-Z]+(?:[A-Z][a-zA-Z]*)*(?:-)?v?\d+(?:\.\d+)?)\b'
+    r'|(?=\((?P<acronym>[A-Z]{2,}[A-Za-z0-9\-]*)\))'
+)
+
+# Email domains in author affiliations
+EMAIL_PATTERN = re.compile(r'@([a-zA-Z0-9\-]+\.[a-zA-Z]{2,})')
 
-def extract_year_from_url(url):
-    """Extract year from arXiv URL"""
-    if "arxiv.org" in url:
-        match = re.search(r'/abs/(\d{2})(\d{2})', url)
-        if match:
-            year_prefix = int(match.group(1))
-            return 2000 + year_prefix
-    return None
+def is_word_char(char):
+    """Check whether a character counts as a regex word character"""
+    return char.isalnum() or char == "_"
 
-def extract_models_from_text(text):
-    """Extract model names from text"""
+def extract_models_from_text(text, text_lower):
+    """Extract model names from text and its lowercased copy"""
     models = set()
     
-    # Check for known models
-    for model in KNOWN_MODELS:
-        if re.search(rf'\b{model}\b', text, re.IGNORECASE):
-            models.add(model)
+    # Check for known models, requiring a word boundary on both sides
+    for end, (length, model) in MODEL_AC.iter(text_lower):
+        start = end - length + 1
+        if start > 0 and is_word_char(text_lower[start - 1]):
+            continue
+        if end + 1 < len(text_lower) and is_word_char(text_lower[end + 1]):
+            continue
+        models.add(model)
     
-    # Extract model-like patterns
-    # Pattern 1: Model names with version numbers
-    version_pattern = r'\b([A-Z][a-zA-Z]+(?:[A-Z][a-zA-Z]*)*(?:-)?v?\d+(?:\.\d+)?)\b'
-    matches = re.findall(version_pattern, text)
-    models.update(m for m in matches if len(m) > 3)
-    
-    # Pattern 2: Acronyms in parentheses
-    acronym_pattern = r'\(([A-Z]{2,}[A-Za-z0-9\-]*)\)'
-    matches = re.findall(acronym_pattern, text)
-    models.update(m for m in matches if 2 < len(m) < 15)
+    # Extract model-like patterns in a single pass
+    for match in MODEL_PATTERN.finditer(text):
+        name = match.group(match.lastgroup)
+        if match.lastgroup == "version":
+            if len(name) > 3:
+                models.add(name)
+        elif 2 < len(name) < 15:
+            models.add(name)
     
     return models
 
-def extract_institutions_from_text(text, authors):
+def extract_institutions_from_text(text, text_lower, authors):
     """Extract institutions from text and author affiliations"""
     institutions = set()
     
-    # Check for known institutions
-    for inst in KNOWN_INSTITUTIONS:
-        if inst.lower() in text.lower():
-            institutions.add(inst)
+    # Check for known institutions (plain substring match)
+    for _, (_, inst) in INSTITUTION_AC.iter(text_lower):
+        institutions.add(inst)
     
     # Extract from email domains if present
-    email_pattern = r'@([a-zA-Z0-9\-]+\.[a-zA-Z]{2,})'
-    domains = re.findall(email_pattern, text)
+    domains = EMAIL_PATTERN.findall(text)
     for domain in domains:
         if 'edu' in domain or 'ac.' in domain:
             inst_name = domain.split('.')[0].title()
@@ -115,32 +131,52 @@ def extract_institutions_from_text(text, authors):
     
     return institutions
 
-def categorize_paper(title, abstract, categories):
-    """Categorize paper into high-level topics"""
-    text = (title + " " + abstract).lower()
-    
-    topic_keywords = {
-        "language-models": ["language model", "llm", "gpt", "bert", "transformer", "nlp", "text generation"],
-        "computer-vision": ["vision", "image", "visual", "detection", "segmentation", "cv", "cnn"],
-        "reinforcement-learning": ["reinforcement learning", "rl", "agent", "reward", "policy", "q-learning"],
-        "generative-ai": ["generative", "diffusion", "gan", "vae", "synthesis", "generation"],
-        "multimodal": ["multimodal", "cross-modal", "vision-language", "clip", "dalle"],
-        "optimization": ["optimization", "efficient", "compression", "quantization", "pruning"],
-        "robotics": ["robot", "robotic", "manipulation", "navigation", "embodied"],
-        "security": ["security", "privacy", "adversarial", "attack", "defense", "safety"],
-        "theory": ["theory", "theoretical", "proof", "bound", "convergence", "complexity"],
-        "applications": ["application", "medical", "finance", "science", "engineering", "biology"]
-    }
-    
-    topics = []
-    for topic, keywords in topic_keywords.items():
-        if any(keyword in text for keyword in keywords):
-            topics.append(topic)
+def categorize_paper(text_lower, categories):
+    """Categorize paper into high-level topics from its lowercased text"""
+    # One pass over the text collects every topic with a matching keyword
+    matched = {topic for _, topic in TOPIC_AC.iter(text_lower)}
+    topics = [topic for topic in TOPIC_KEYWORDS if topic in matched]
     
     return topics
 
+def process_paper(paper):
+    """Extract year, models, institutions, topics, authors and event from one paper"""
+    payload = paper.get("payload", {})
+    
+    title = payload.get("title", "")
+    authors = payload.get("authors", [])
+    categories = payload.get("categories", [])
+    abstract = payload.get("abstract", "")
+    url = payload.get("url", "")
+    paper_id = paper.get("id", "")
+    
+    year = extract_year_from_url(url)
+    
+    # Lowercase once and share it across the matchers
+    full_text = title + " " + abstract
+    full_text_lower = full_text.lower()
+    
+    # Extract models and institutions
+    models = extract_models_from_text(full_text, full_text_lower)
+    institutions = extract_institutions_from_text(full_text, full_text_lower, authors)
+    
+    # Categorize paper
+    topics = categorize_paper(full_text_lower, categories)
+    
+    # Create paper publication event
+    event = None
+    if title and year:
+        event = {
+            "id": f"{year}-{str(paper_id)[:8]}",
+            "timestamp": f"{year}-01-01T00:00:00Z",
+            "description": f"{title}",
+            "category": topics[0] if topics else "research"
+        }
+    
+    return year, models, institutions, topics, [a for a in authors if a], event
+
 def enhanced_extraction(papers):
-    """Enhanced extraction with better categorization"""
+    """Enhanced extraction with better categorization over an iterable of papers"""
     entities = []
     events = []
     
@@ -151,51 +187,35 @@ def enhanced_extraction(papers):
     topic_stats = Counter()
     yearly_stats = Counter()
     
-    # Process each paper
-    for i, paper in enumerate(papers):
-        payload = paper.get("payload", {})
-        
-        title = payload.get("title", "")
-        authors = payload.get("authors", [])
-        categories = payload.get("categories", [])
-        abstract = payload.get("abstract", "")
-        url = payload.get("url", "")
-        paper_id = paper.get("id", "")
-        
-        year = extract_year_from_url(url)
-        if year:
-            yearly_stats[year] += 1
-        
-        # Extract models
-        full_text = title + " " + abstract
-        models = extract_models_from_text(full_text)
-        for model in models:
-            model_stats[model] += 1
-        
-        # Extract institutions
-        institutions = extract_institutions_from_text(full_text, authors)
-        for inst in institutions:
-            institution_stats[inst] += 1
-        
-        # Categorize paper
-        topics = categorize_paper(title, abstract, categories)
-        for topic in topics:
-            topic_stats[topic] += 1
-        
-        # Track authors
-        for author in authors:
-            if author:
-                author_stats[author] += 1
-        
-        # Create paper publication event
-        if title and year:
-            event = {
-                "id": f"{year}-{str(paper_id)[:8]}",
-                "timestamp": f"{year}-01-01T00:00:00Z",
-                "description": f"{title}",
-                "category": topics[0] if topics else "research"
-            }
-            events.append(event)
+    # Fan per-paper extraction out to worker processes; imap keeps the input
+    # order so tie-breaking in the Counters matches a serial run. Papers are
+    # pulled here in chunks so fetch errors surface in this process rather
+    # than in the pool's task-handler thread.
+    papers = iter(papers)
+    paper_count = 0
+    with Pool() as pool:
+        while True:
+            chunk = list(islice(papers, 1024))
+            if not chunk:
+                break
+            
+            results = pool.imap(process_paper, chunk, chunksize=64)
+            for year, models, institutions, topics, authors, event in results:
+                paper_count += 1
+                if year:
+                    yearly_stats[year] += 1
+                for model in models:
+                    model_stats[sys.intern(model)] += 1
+                for inst in institutions:
+                    institution_stats[sys.intern(inst)] += 1
+                for topic in topics:
+                    topic_stats[sys.intern(topic)] += 1
+                for author in authors:
+                    author_stats[sys.intern(author)] += 1
+                if event:
+                    events.append(event)
+    
+    print(f"Found {paper_count} papers")
     
     # Create entities for prominent authors
     for author, count in author_stats.most_common(200):  # Top 200 authors
@@ -282,46 +302,35 @@ def enhanced_extraction(papers):
     return entities, events
 
 def main():
-    print("Extracting papers from Qdrant...")
-    papers = extract_all_papers()
-    print(f"Found {len(papers)} papers")
-    
-    print("Running enhanced extraction...")
-    new_entities, new_events = enhanced_extraction(papers)
+    print("Loading papers into enhanced extraction...")
+    new_entities, new_events = enhanced_extraction(load_papers())
     
     # Load existing data
-    with open("data/entities.json", "r") as f:
-        entities = json.load(f)
-    
-    with open("data/events.json", "r") as f:
-        events = json.load(f)
+    with open("data/entities.json", "rb") as f:
+        entities = orjson.loads(f.read())
     
-    # Merge avoiding duplicates
-    existing_names = {e["name"] for e in entities}
-    existing_ids = {e["id"] for e in events}
+    with open("data/events.json", "rb") as f:
+        events = orjson.loads(f.read())
     
-    # Add new unique entities
+    # Merge avoiding duplicates, keyed by name/id so the first one seen wins
+    entities_by_name = {e["name"]: e for e in entities}
     for entity in new_entities:
-        if entity["name"] not in existing_names:
-            entities.append(entity)
-            existing_names.add(entity["name"])
+        entities_by_name.setdefault(entity["name"], entity)
     
-    # Add new unique events
+    events_by_id = {e["id"]: e for e in events}
     for event in new_events:
-        if event["id"] not in existing_ids:
-            events.append(event)
-            existing_ids.add(event["id"])
+        events_by_id.setdefault(event["id"], event)
     
     # Sort for consistency
-    entities.sort(key=lambda x: x["name"])
-    events.sort(key=lambda x: x["timestamp"], reverse=True)
+    entities = sorted(entities_by_name.values(), key=itemgetter("name"))
+    events = sorted(events_by_id.values(), key=itemgetter("timestamp"), reverse=True)
     
     # Save
-    with open("data/entities.json", "w") as f:
-        json.dump(entities, f, indent=2)
+    with open("data/entities.json", "wb") as f:
+        f.write(orjson.dumps(entities, option=orjson.OPT_INDENT_2))
     
-    with open("data/events.json", "w") as f:
-        json.dump(events, f, indent=2)
+    with open("data/events.json", "wb") as f:
+        f.write(orjson.dumps(events, option=orjson.OPT_INDENT_2))
     
     print(f"Total entities: {len(entities)}")
     print(f"Total events: {len(events)}")
@@ -1,61 +1,29 @@
 #!/usr/bin/env python3
 """Extract entities and events from Qdrant papers collection"""
 
-import json
-import requests
+import orjson
 from datetime import datetime
 from collections import defaultdict
+from operator import itemgetter
 import re
+from paper_store import load_papers, extract_year_from_url
 
-# Qdrant configuration
-QDRANT_URL = "http://localhost:6333"
-COLLECTION_NAME = "papers"
+# Common patterns for models and systems
+MODEL_PATTERNS = [
+    re.compile(r'\b([A-Z][a-zA-Z]*(?:[A-Z][a-zA-Z]*)+)\b'),  # CamelCase
+    re.compile(r'\b([A-Z][A-Z0-9\-]+[A-Z0-9])\b'),  # UPPERCASE-NAMES
+    re.compile(r'\b([A-Za-z]+(?:Net|Model|System|Framework|Engine))\b'),  # *Net, *Model, etc
+]
 
-def extract_all_papers():
-    """Extract all papers from Qdrant collection"""
-    papers = []
-    offset = None
-    
-    while True:
-        # Scroll through collection
-        payload = {
-            "limit": 100,
-            "with_payload": True,
-            "with_vector": False
-        }
-        if offset:
-            payload["offset"] = offset
-            
-        response = requests.post(
-            f"{QDRANT_URL}/collections/{COLLECTION_NAME}/points/scroll",
-            json=payload
-        )
-        
-        result = response.json()
-        batch = result.get("result", {}).get("points", [])
-        
-        if not batch:
-            break
-            
-        papers.extend(batch)
-        offset = result.get("result", {}).get("next_page_offset")
-        
-        if not offset:
-            break
-    
-    return papers
+# Capitalized words the model patterns pick up that are not names
+COMMON_WORDS = {'The', 'This', 'These', 'That', 'Those', 'Our', 'We', 'In', 'On', 'At', 'For', 'With', 'From', 'To', 'Of', 'And', 'Or', 'But', 'Not'}
 
-def extract_year_from_url(url):
-    """Extract year from arXiv URL"""
-    if "arxiv.org" in url:
-        # Match patterns like /abs/2502.19614 or /abs/2402.12345
-        match = re.search(r'/abs/(\d{2})(\d{2})', url)
-        if match:
-            year_prefix = int(match.group(1))
-            # arXiv uses YYMM format, years 00-99 map to 2000-2099
-            if year_prefix >= 0:
-                return 2000 + year_prefix
-    return None
+def occurs_at_least_twice(text, needle):
+    """Check for two non-overlapping occurrences, stopping at the second"""
+    first = text.find(needle)
+    if first < 0:
+        return False
+    return text.find(needle, first + len(needle)) >= 0
 
 def process_papers_to_entities_and_events(papers):
     """Process papers to extract entities and events"""
@@ -100,24 +68,16 @@ def process_papers_to_entities_and_events(papers):
         # Extract model/system names from title and abstract
         text = title + " " + abstract
         
-        # Common patterns for models and systems
-        model_patterns = [
-            r'\b([A-Z][a-zA-Z]*(?:[A-Z][a-zA-Z]*)+)\b',  # CamelCase
-            r'\b([A-Z][A-Z0-9\-]+[A-Z0-9])\b',  # UPPERCASE-NAMES
-            r'\b([A-Za-z]+(?:Net|Model|System|Framework|Engine))\b',  # *Net, *Model, etc
-        ]
-        
         potential_models = set()
-        for pattern in model_patterns:
-            matches = re.findall(pattern, text)
+        for pattern in MODEL_PATTERNS:
+            matches = pattern.findall(text)
             potential_models.update(matches)
         
         # Filter common words and add as entities
-        common_words = {'The', 'This', 'These', 'That', 'Those', 'Our', 'We', 'In', 'On', 'At', 'For', 'With', 'From', 'To', 'Of', 'And', 'Or', 'But', 'Not'}
         for model in potential_models:
-            if model not in common_words and len(model) > 2 and model not in seen_entities:
+            if model not in COMMON_WORDS and len(model) > 2 and model not in seen_entities:
                 # Check if it's mentioned multiple times (likely important)
-                if text.count(model) >= 2:
+                if occurs_at_least_twice(text, model):
                     seen_entities.add(model)
                     entity = {
                         "name": model,
@@ -155,8 +115,8 @@ def process_papers_to_entities_and_events(papers):
     return entities, events
 
 def main():
-    print("Extracting papers from Qdrant...")
-    papers = extract_all_papers()
+    print("Loading papers...")
+    papers = list(load_papers())
     print(f"Found {len(papers)} papers")
     
     print("Processing papers to extract entities and events...")
@@ -165,36 +125,39 @@ def main():
     print(f"Extracted {len(entities)} entities and {len(events)} events")
     
     # Load existing data
-    with open("data/entities.json", "r") as f:
-        existing_entities = json.load(f)
+    with open("data/entities.json", "rb") as f:
+        existing_entities = orjson.loads(f.read())
     
-    with open("data/events.json", "r") as f:
-        existing_events = json.load(f)
+    with open("data/events.json", "rb") as f:
+        existing_events = orjson.loads(f.read())
     
-    # Merge with existing data (avoiding duplicates)
-    existing_entity_names = {e["name"] for e in existing_entities}
-    existing_event_ids = {e["id"] for e in existing_events}
+    # Merge with existing data (avoiding duplicates), existing entries win
+    entities_by_name = {e["name"]: e for e in existing_entities}
+    existing_entity_count = len(entities_by_name)
+    for entity in entities:
+        entities_by_name.setdefault(entity["name"], entity)
     
-    new_entities = [e for e in entities if e["name"] not in existing_entity_names]
-    new_events = [e for e in events if e["id"] not in existing_event_ids]
+    events_by_id = {e["id"]: e for e in existing_events}
+    existing_event_count = len(events_by_id)
+    for event in events:
+        events_by_id.setdefault(event["id"], event)
     
-    # Combine and save
-    all_entities = existing_entities + new_entities
-    all_events = existing_events + new_events
+    new_entity_count = len(entities_by_name) - existing_entity_count
+    new_event_count = len(events_by_id) - existing_event_count
     
     # Sort for consistency
-    all_entities.sort(key=lambda x: x["name"])
-    all_events.sort(key=lambda x: x["timestamp"], reverse=True)
+    all_entities = sorted(entities_by_name.values(), key=itemgetter("name"))
+    all_events = sorted(events_by_id.values(), key=itemgetter("timestamp"), reverse=True)
     
     # Save updated data
-    with open("data/entities.json", "w") as f:
-        json.dump(all_entities, f, indent=2)
+    with open("data/entities.json", "wb") as f:
+        f.write(orjson.dumps(all_entities, option=orjson.OPT_INDENT_2))
     
-    with open("data/events.json", "w") as f:
-        json.dump(all_events, f, indent=2)
+    with open("data/events.json", "wb") as f:
+        f.write(orjson.dumps(all_events, option=orjson.OPT_INDENT_2))
     
-    print(f"Total entities: {len(all_entities)} ({len(new_entities)} new)")
-    print(f"Total events: {len(all_events)} ({len(new_events)} new)")
+    print(f"Total entities: {len(all_entities)} ({new_entity_count} new)")
+    print(f"Total events: {len(all_events)} ({new_event_count} new)")
     print("Data saved to data/entities.json and data/events.json")
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""Shared access to the Qdrant papers collection with a local cache"""
+
+import orjson
+import os
+import time
+from qdrant_client import QdrantClient
+from concurrent.futures import ThreadPoolExecutor
+
+# Qdrant configuration
+QDRANT_URL = "http://localhost:6333"
+COLLECTION_NAME = "papers"
+
+# Only the payload fields the extraction reads are fetched
+PAYLOAD_FIELDS = ["title", "authors", "categories", "abstract", "url"]
+
+# Papers are cached as JSON lines so reruns can skip Qdrant entirely
+CACHE_PATH = "data/papers.jsonl"
+CACHE_MAX_AGE_HOURS = 24
+
+def fetch_page(client, offset):
+    """Fetch one scroll page from Qdrant over gRPC, returning (points, next_offset)"""
+    records, next_offset = client.scroll(
+        collection_name=COLLECTION_NAME,
+        limit=1000,
+        offset=offset,
+        with_payload=PAYLOAD_FIELDS,
+        with_vectors=False,
+        timeout=60
+    )
+    
+    points = [{"id": record.id, "payload": record.payload or {}} for record in records]
+    return points, next_offset
+
+def iter_paper_batches():
+    """Yield batches of papers from Qdrant, prefetching the next page"""
+    client = QdrantClient(url=QDRANT_URL, prefer_grpc=True)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(fetch_page, client, None)
+            
+            while True:
+                batch, offset = future.result()
+                
+                if not batch:
+                    break
+                
+                # Request the next page before handing this one to the caller
+                if offset is not None:
+                    future = executor.submit(fetch_page, client, offset)
+                
+                yield batch
+                
+                if offset is None:
+                    break
+    finally:
+        client.close()
+
+def is_cache_fresh(max_age_hours):
+    """Check whether the papers cache exists and is newer than max_age_hours"""
+    try:
+        age = time.time() - os.path.getmtime(CACHE_PATH)
+    except OSError:
+        return False
+    return age < max_age_hours * 3600
+
+def load_papers(max_age_hours=CACHE_MAX_AGE_HOURS):
+    """Yield papers from the local cache if fresh, otherwise from Qdrant while refreshing it"""
+    if is_cache_fresh(max_age_hours):
+        with open(CACHE_PATH, "rb") as f:
+            for line in f:
+                yield orjson.loads(line)
+        return
+    
+    # Write to a temporary file so a partial scroll never looks like a fresh cache
+    tmp_path = CACHE_PATH + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for batch in iter_paper_batches():
+                for paper in batch:
+                    f.write(orjson.dumps(paper, option=orjson.OPT_APPEND_NEWLINE))
+                yield from batch
+    except BaseException:
+        # Failed or abandoned pulls clean up after themselves
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    os.replace(tmp_path, CACHE_PATH)
+
+def extract_year_from_url(url):
+    """Extract year from arXiv URL"""
+    if "arxiv.org" in url:
+        # Match patterns like /abs/2502.19614 or /abs/2402.12345 by slicing;
+        # arXiv uses YYMM format, years 00-99 map to 2000-2099
+        start = url.find("/abs/")
+        while start >= 0:
+            yymm = url[start + 5:start + 9]
+            if len(yymm) == 4 and yymm.isdecimal():
+                return 2000 + int(yymm[:2])
+            start = url.find("/abs/", start + 1)
+    return None